@@ -0,0 +1,287 @@
+# Usage: python plan_capacity.py claims.csv [--target-failure-rate 0.01] [--output regions.yaml]
+#
+# Recommends per-region fleet sizes (buffer_size and max_server_count) from
+# historical claim logs. Claim demand from the logs is replayed against
+# simulated fleets with many candidate sizes at once, modelling DS boot time and
+# session length, and the cheapest size that meets the target claim-failure
+# rate is emitted as fleet region parameters.
+#
+# Claim logs are CSV (with a header row), JSON lines (.jsonl) or a JSON array
+# (.json) of objects with these fields:
+#   timestamp        (required) ISO 8601 time or Unix epoch seconds of the claim
+#   region           (required) region the server was claimed in
+#   session_seconds  (optional) how long the claimed session lasted
+#   time_to_claim    (optional) seconds from match found to server claimed
+#
+# The sample matchmaker (matchmaking-server/server.py) writes this format when
+# CLAIM_LOG_PATH is set.
+
+import argparse
+import csv
+import json
+import math
+import sys
+import yaml
+import numpy as np
+from collections import defaultdict
+from datetime import datetime
+
+
+def load_claims(path: str) -> dict:
+    """Return {region: (timestamps, session lengths, times to claim)} parsed from a claim log."""
+    timestamps = defaultdict(list)
+    sessions = defaultdict(list)
+    times_to_claim = defaultdict(list)
+
+    with open(path, newline="") as f:
+        if path.endswith(".jsonl"):
+            rows = (json.loads(line) for line in f if line.strip())
+        elif path.endswith(".json"):
+            rows = json.load(f)
+            if not isinstance(rows, list):
+                raise ValueError(f"{path}: expected a JSON array of claims (use .jsonl for JSON lines)")
+        else:
+            rows = csv.DictReader(f)
+        for row in rows:
+            region = row["region"]
+            timestamps[region].append(_parse_timestamp(row["timestamp"]))
+            if row.get("session_seconds") not in (None, ""):
+                sessions[region].append(float(row["session_seconds"]))
+            if row.get("time_to_claim") not in (None, ""):
+                times_to_claim[region].append(float(row["time_to_claim"]))
+
+    return {
+        region: (np.array(sorted(times)), np.array(sessions[region]), np.array(times_to_claim[region]))
+        for region, times in timestamps.items()
+    }
+
+
+def arrival_rates(timestamps: np.ndarray, start: float, end: float, bin_seconds: float,
+                  step_seconds: float, scale: float = 1.0) -> np.ndarray:
+    """Bin claims into a claims-per-second profile, resampled to simulation steps."""
+    bins = max(1, math.ceil((end - start) / bin_seconds))
+    counts, _ = np.histogram(timestamps, bins=bins, range=(start, start + bins * bin_seconds))
+    rates = counts / bin_seconds * scale
+    steps_per_bin = max(1, round(bin_seconds / step_seconds))
+    return np.repeat(rates, steps_per_bin)
+
+
+def lognormal_sampler(mean: float, stdev: float):
+    """Return a sampler of lognormal values with the given mean and standard deviation."""
+    sigma = math.sqrt(math.log(1 + (stdev / mean) ** 2)) if stdev > 0 else 0.0
+    mu = math.log(mean) - sigma ** 2 / 2
+    return lambda rng, size: rng.lognormal(mu, sigma, size)
+
+
+def empirical_sampler(values: np.ndarray):
+    """Return a sampler that resamples observed values."""
+    return lambda rng, size: rng.choice(values, size)
+
+
+def simulate(rates: np.ndarray, step_seconds: float, buffers: np.ndarray, max_servers: np.ndarray,
+             min_servers: int, boot_sampler, session_sampler, replicas: int, horizon_seconds: float,
+             rng: np.random.Generator) -> dict:
+    """
+    Simulate every candidate fleet size against the same demand.
+
+    All candidates (`buffers[i]`, `max_servers[i]`) and all Monte Carlo replicas
+    advance together as numpy arrays of shape (replicas, candidates). Every
+    candidate in a replica sees the same claims, session lengths and boot times,
+    so differences between candidates come from fleet size alone.
+
+    The fleet follows the AMS scaling rules: it keeps `buffer` servers ready or
+    booting, never runs more than `max_servers` in total, and never fewer than
+    `min_servers`. A claim fails when no ready server is available.
+    """
+    steps = len(rates)
+    shape = (replicas, len(buffers))
+    buffer = np.broadcast_to(buffers, shape)
+    limit = np.broadcast_to(max_servers, shape)
+
+    # Ring buffers of servers finishing boot / sessions ending in each future step
+    ring = max(2, math.ceil(horizon_seconds / step_seconds) + 1)
+    boot_done = np.zeros((ring,) + shape, dtype=np.int32)
+    session_done = np.zeros((ring,) + shape, dtype=np.int32)
+
+    # Start from a warm fleet, as if it had been running before the log window
+    ready = np.minimum(np.maximum(buffer, min_servers), limit).astype(np.int32)
+    booting = np.zeros(shape, dtype=np.int32)
+    in_session = np.zeros(shape, dtype=np.int32)
+    failures = np.zeros(shape, dtype=np.int64)
+    server_steps = np.zeros(shape, dtype=np.int64)
+    peak = ready.copy()
+
+    arrivals = rng.poisson(rates[:, None] * step_seconds, size=(steps, replicas))
+
+    def schedule(target, counts, slot, sampler):
+        # Each of the first k servers in a cell gets the k-th duration drawn for its replica
+        most = int(counts.max())
+        if most == 0:
+            return
+        durations = np.clip(np.rint(sampler(rng, (most, replicas)) / step_seconds), 1, ring - 1).astype(np.int64)
+        for k in range(most):
+            r_idx, c_idx = np.nonzero(counts > k)
+            target[(slot + durations[k, r_idx]) % ring, r_idx, c_idx] += 1
+
+    for t in range(steps):
+        slot = t % ring
+        ready += boot_done[slot]
+        booting -= boot_done[slot]
+        in_session -= session_done[slot]
+        boot_done[slot] = 0
+        session_done[slot] = 0
+
+        claims = arrivals[t][:, None]
+        served = np.minimum(claims, ready)
+        failures += claims - served
+        ready -= served
+        in_session += served
+        schedule(session_done, served, slot, session_sampler)
+
+        total = ready + booting + in_session
+        launch = np.maximum(buffer - (ready + booting), min_servers - total)
+        launch = np.clip(np.minimum(launch, limit - total), 0, None)
+        booting += launch
+        schedule(boot_done, launch, slot, boot_sampler)
+
+        total += launch
+        server_steps += total
+        np.maximum(peak, total, out=peak)
+
+    total_claims = max(int(arrivals.sum()), 1)
+    return {
+        "failure_rate": failures.sum(axis=0) / total_claims,
+        "mean_servers": server_steps.mean(axis=0) / steps,
+        "peak_servers": peak.max(axis=0),
+    }
+
+
+def recommend(results: dict, buffers: np.ndarray, max_servers: np.ndarray, target: float) -> dict:
+    """Pick the candidate with the fewest average servers that meets the target failure rate."""
+    failure = results["failure_rate"]
+    feasible = np.flatnonzero(failure <= target)
+    if len(feasible):
+        # Cheapest first, then the lowest cap, then the lowest buffer
+        order = np.lexsort((buffers[feasible], max_servers[feasible], results["mean_servers"][feasible]))
+        best = feasible[order[0]]
+    else:
+        best = int(np.argmin(failure))
+    return {
+        "buffer_size": int(buffers[best]),
+        "max_server_count": int(max_servers[best]),
+        "failure_rate": float(failure[best]),
+        "mean_servers": float(results["mean_servers"][best]),
+        "peak_servers": int(results["peak_servers"][best]),
+        "meets_target": bool(len(feasible)),
+    }
+
+
+def candidate_grid(peak_rate: float, boot_mean: float, session_mean: float,
+                   max_buffer: int = None, max_servers: int = None, min_servers: int = 0):
+    """Build the (buffer_size, max_server_count) pairs to simulate."""
+    if max_buffer is None:
+        # Enough to absorb peak demand for twice the mean boot time
+        max_buffer = math.ceil(peak_rate * boot_mean * 2) + 2
+    if max_servers is None:
+        # Twice the peak concurrency predicted by Little's law, plus the buffer
+        max_servers = math.ceil(peak_rate * (session_mean + boot_mean) * 2) + max_buffer
+    max_servers = max(max_servers, min_servers, 1)
+
+    buffer_values = np.arange(0, max_buffer + 1)
+    server_values = np.unique(np.linspace(max(min_servers, 1), max_servers, num=min(max_servers, 24)).round().astype(int))
+    buffers, servers = np.meshgrid(buffer_values, server_values)
+    return buffers.ravel(), servers.ravel()
+
+
+def _parse_timestamp(value) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Recommend AMS fleet region sizes from claim logs")
+    parser.add_argument("logs", help="Claim log as CSV, JSON lines (.jsonl) or a JSON array (.json)")
+    parser.add_argument("--target-failure-rate", type=float, default=0.01, help="Acceptable fraction of failed claims (default: 0.01)")
+    parser.add_argument("--boot-seconds", type=float, default=60.0, help="Mean DS boot time, from VM request to ready (default: 60)")
+    parser.add_argument("--boot-seconds-stdev", type=float, default=15.0, help="Standard deviation of DS boot time (default: 15)")
+    parser.add_argument("--session-seconds", type=float, default=900.0, help="Mean session length, used when the logs have no session_seconds (default: 900)")
+    parser.add_argument("--session-seconds-stdev", type=float, default=300.0, help="Standard deviation of session length (default: 300)")
+    parser.add_argument("--demand-scale", type=float, default=1.0, help="Multiply the observed demand, e.g. 1.5 for expected growth (default: 1.0)")
+    parser.add_argument("--min-server-count", type=int, default=0, help="min_server_count to use for every region (default: 0)")
+    parser.add_argument("--max-buffer", type=int, help="Largest buffer_size to consider (default: derived from peak demand)")
+    parser.add_argument("--max-servers", type=int, help="Largest max_server_count to consider (default: derived from peak demand)")
+    parser.add_argument("--step-seconds", type=float, default=5.0, help="Simulation time step (default: 5)")
+    parser.add_argument("--bin-seconds", type=float, default=300.0, help="Window for measuring the claim rate in the logs (default: 300)")
+    parser.add_argument("--replicas", type=int, default=20, help="Simulation runs per candidate (default: 20)")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible results")
+    parser.add_argument("--output", help="Write the recommended regions to this YAML or JSON file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    rng = np.random.default_rng(args.seed)
+    claims = load_claims(args.logs)
+    if not claims:
+        print("No claims found in", args.logs)
+        exit(1)
+
+    start = min(times[0] for times, _, _ in claims.values())
+    end = max(times[-1] for times, _, _ in claims.values()) + args.bin_seconds
+    boot_sampler = lognormal_sampler(args.boot_seconds, args.boot_seconds_stdev)
+
+    regions = []
+    for region, (times, sessions, times_to_claim) in sorted(claims.items()):
+        rates = arrival_rates(times, start, end, args.bin_seconds, args.step_seconds, args.demand_scale)
+        if len(sessions):
+            session_sampler = empirical_sampler(sessions)
+            session_mean, session_max = float(sessions.mean()), float(sessions.max())
+        else:
+            session_sampler = lognormal_sampler(args.session_seconds, args.session_seconds_stdev)
+            session_mean = args.session_seconds
+            session_max = args.session_seconds + 6 * args.session_seconds_stdev
+        horizon = max(session_max, args.boot_seconds + 6 * args.boot_seconds_stdev)
+
+        buffers, max_servers = candidate_grid(rates.max(), args.boot_seconds, session_mean,
+                                              args.max_buffer, args.max_servers, args.min_server_count)
+        results = simulate(rates, args.step_seconds, buffers, max_servers, args.min_server_count,
+                           boot_sampler, session_sampler, args.replicas, horizon, rng)
+        best = recommend(results, buffers, max_servers, args.target_failure_rate)
+
+        print(f"{region}: {len(times)} claims, peak {rates.max() * 60:.1f}/min, {len(buffers)} candidates simulated")
+        if len(times_to_claim):
+            # How the current fleet performed, as a baseline for the recommendation
+            p50, p95 = np.percentile(times_to_claim, [50, 95])
+            print(f"  observed time to claim: p50 {p50:.1f}s, p95 {p95:.1f}s")
+        print(f"  buffer_size={best['buffer_size']} max_server_count={best['max_server_count']} "
+              f"-> claim failures {best['failure_rate']:.2%}, "
+              f"avg {best['mean_servers']:.1f} servers, peak {best['peak_servers']}")
+        if not best["meets_target"]:
+            print(f"  warning: no candidate met the {args.target_failure_rate:.2%} target; "
+                  f"raise --max-buffer/--max-servers or check boot times")
+
+        regions.append({
+            "region": region,
+            "bufferSize": best["buffer_size"],
+            "minServerCount": args.min_server_count,
+            "maxServerCount": best["max_server_count"],
+            "dynamicBuffer": False,
+        })
+
+    # Same shape as the `regions` field of the AMS fleet parameters (and fleet rollout specs)
+    fleet_parameters = {"regions": regions}
+    if args.output:
+        with open(args.output, "w") as f:
+            if args.output.endswith(".json"):
+                json.dump(fleet_parameters, f, indent=2)
+            else:
+                yaml.safe_dump(fleet_parameters, f, sort_keys=False)
+        print(f"Wrote fleet region parameters to {args.output}")
+    else:
+        yaml.safe_dump(fleet_parameters, sys.stdout, sort_keys=False)
+
+
+if __name__ == "__main__":
+    main()
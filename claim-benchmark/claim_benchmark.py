@@ -0,0 +1,165 @@
+# Usage: python claim_benchmark.py [--rates 5,10,20,50] [--duration 10] [--concurrency 32]
+#
+# Measures how server claims behave under load, without using real AMS capacity.
+# Claims are sent with the same request as the sample matchmaker
+# (matchmaking-server/server.py): an ApiFleetClaimByKeysReq with claim keys,
+# regions and a session ID, sent through the AccelByte Python SDK.
+#
+# By default the claims go to an in-process mock of the claim API (see
+# mock_ams.py) that simulates per-region capacity, DS boot time and API latency.
+# Pass --base-url to target a separately started mock instead.
+#
+# For each target rate the benchmark sends claims at that rate (open loop) and
+# reports the sustained claims/sec, latency percentiles and failure rates.
+
+import argparse
+import logging
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from accelbyte_py_sdk.core import MyConfigRepository
+from accelbyte_py_sdk.api.ams.models import ApiFleetClaimByKeysReq
+from accelbyte_py_sdk.api.ams.operations.fleets import FleetClaimByKeys
+
+import mock_ams
+
+# Shared helpers live in ../common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import ams_client
+
+OUTCOME_CLAIMED = "claimed"
+OUTCOME_REJECTED = "rejected"  # 404: no server available in any of the requested regions
+OUTCOME_ERROR = "error"  # any other failure: connection errors, auth, bad requests, 5xx
+
+
+def claim_once(namespace: str, claim_keys: list, regions: list, scheduled_at: float) -> tuple:
+    """Send one claim and return (outcome, latency in seconds measured from its scheduled time)."""
+    session_id = f"bench-{uuid.uuid4()}"
+    body = ApiFleetClaimByKeysReq().with_claim_keys(claim_keys).with_regions(regions).with_session_id(session_id)
+    try:
+        _, err, status = ams_client.run_request_with_status(FleetClaimByKeys.create(body=body, namespace=namespace))
+    except Exception:
+        return OUTCOME_ERROR, time.perf_counter() - scheduled_at
+    latency = time.perf_counter() - scheduled_at
+
+    if not err:
+        return OUTCOME_CLAIMED, latency
+    if status == 404:
+        return OUTCOME_REJECTED, latency
+    return OUTCOME_ERROR, latency
+
+
+def run_stage(rate: float, duration: float, concurrency: int, namespace: str, claim_keys: list, regions: list) -> dict:
+    """
+    Send claims at `rate` per second for `duration` seconds.
+
+    Claims are scheduled on a fixed timetable regardless of how fast earlier
+    ones complete, and latency is measured from the scheduled time. When the
+    worker pool is saturated, queueing delay therefore shows up in the latency
+    instead of silently lowering the offered load.
+    """
+    total = max(1, int(rate * duration))
+    futures = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(total):
+            scheduled_at = start + i / rate
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(claim_once, namespace, claim_keys, regions, scheduled_at))
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    outcomes = Counter(outcome for outcome, _ in results)
+    latencies = sorted(latency for _, latency in results)
+    return {
+        "rate": rate,
+        "sent": total,
+        "elapsed": elapsed,
+        "claims_per_sec": outcomes[OUTCOME_CLAIMED] / elapsed,
+        "requests_per_sec": total / elapsed,
+        "outcomes": outcomes,
+        "p50": _percentile(latencies, 50),
+        "p90": _percentile(latencies, 90),
+        "p99": _percentile(latencies, 99),
+        "max": latencies[-1],
+    }
+
+
+def print_report(stages: list):
+    print()
+    print(f"{'target/s':>9} {'sent':>6} {'req/s':>7} {'claims/s':>9} {'rejected':>9} {'errors':>7} "
+          f"{'p50 ms':>7} {'p90 ms':>7} {'p99 ms':>7} {'max ms':>7}")
+    for stage in stages:
+        outcomes = stage["outcomes"]
+        print(f"{stage['rate']:>9.1f} {stage['sent']:>6} {stage['requests_per_sec']:>7.1f} "
+              f"{stage['claims_per_sec']:>9.1f} "
+              f"{outcomes[OUTCOME_REJECTED] / stage['sent']:>9.1%} {outcomes[OUTCOME_ERROR] / stage['sent']:>7.1%} "
+              f"{stage['p50'] * 1000:>7.0f} {stage['p90'] * 1000:>7.0f} "
+              f"{stage['p99'] * 1000:>7.0f} {stage['max'] * 1000:>7.0f}")
+
+
+def _percentile(sorted_values: list, percent: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark AMS server claims against a local mock")
+    parser.add_argument("--rates", default="5,10,20,50", help="Comma-separated claim rates per second to test in order (default: 5,10,20,50)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run each rate (default: 10)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Maximum claims in flight (default: 32)")
+    parser.add_argument("--claim-keys", default="default", help="Comma-separated claim keys (default: default)")
+    parser.add_argument("--claim-regions", default="us-west-2,us-east-1", help="Comma-separated regions in claim order (default: us-west-2,us-east-1)")
+    parser.add_argument("--base-url", help="Use an already running mock at this URL instead of starting one")
+    parser.add_argument("--port", type=int, default=8081, help="Port for the in-process mock (default: 8081)")
+    mock_ams.add_mock_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    claim_keys = args.claim_keys.split(",")
+    regions = args.claim_regions.split(",")
+    rates = [float(rate) for rate in args.rates.split(",")]
+
+    mock = None
+    base_url = args.base_url
+    if not base_url:
+        mock = mock_ams.create_mock(args)
+        mock_ams.start_server(mock, args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+        print(f"Started mock AMS at {base_url}")
+
+    # The SDK logs every non-2xx response; rejected claims are expected here and counted instead
+    logging.getLogger("accelbyte_py_sdk.http").setLevel(logging.CRITICAL)
+
+    # Log in and claim through the same pooled client setup as the matchmaker
+    namespace = "mock"
+    _, error = ams_client.login(
+        config=MyConfigRepository(base_url, "benchmark", "benchmark", namespace),
+        token_cache_path=None,
+        max_keepalive_connections=max(20, args.concurrency),
+    )
+    if error:
+        print("Login failed:", error)
+        exit(1)
+
+    stages = []
+    for rate in rates:
+        if mock:
+            mock.reset()  # every stage starts from a fully buffered fleet
+        print(f"Claiming at {rate:g}/s for {args.duration:g}s...")
+        stages.append(run_stage(rate, args.duration, args.concurrency, namespace, claim_keys, regions))
+        if mock:
+            print("  mock:", ", ".join(f"{key}={count}" for key, count in sorted(mock.stats.items())))
+
+    print_report(stages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# A local stand-in for the AMS fleet claim API, for benchmarking only.
+#
+# Usage: python mock_ams.py [--port 8081] [--region us-west-2:5:20] [--region us-east-1:5:20]
+#
+# Implements just enough of AGS for the Python SDK to log in and claim servers:
+#   POST /iam/v3/oauth/token                        client credentials login
+#   PUT  /ams/v1/namespaces/{namespace}/servers/claim  claim a server by keys
+#
+# Each region simulates an AMS fleet region: it keeps `buffer` servers ready,
+# boots replacements (taking --boot-seconds) after each claim up to `max`
+# servers, and frees a server when its session (--session-seconds) ends.
+# Claims are served from the first region in the request with a ready server.
+
+import argparse
+import heapq
+import http
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CLAIM_PATH = re.compile(r"^/ams/v1/namespaces/[^/]+/servers/claim$")
+TOKEN_PATH = "/iam/v3/oauth/token"
+
+
+class MockRegion:
+    """A fleet region with a ready buffer, booting servers and servers in session."""
+
+    def __init__(self, name: str, buffer: int, max_servers: int, boot_seconds: float, session_seconds: float):
+        self.name = name
+        self.buffer = buffer
+        self.max_servers = max_servers
+        self.boot_seconds = boot_seconds
+        self.session_seconds = session_seconds
+        self.reset()
+
+    def reset(self):
+        self.ready = min(self.buffer, self.max_servers)
+        self._booting = []  # heap of times at which a server becomes ready
+        self._in_session = []  # heap of times at which a session ends
+
+    def try_claim(self, now: float) -> bool:
+        """Claim a ready server if there is one. Not thread-safe; callers hold the API lock."""
+        self._advance(now)
+        if self.ready == 0:
+            return False
+        self.ready -= 1
+        heapq.heappush(self._in_session, now + self._jitter(self.session_seconds))
+        self._replenish(now)
+        return True
+
+    def _advance(self, now: float):
+        while self._booting and self._booting[0] <= now:
+            heapq.heappop(self._booting)
+            self.ready += 1
+        while self._in_session and self._in_session[0] <= now:
+            heapq.heappop(self._in_session)
+        self._replenish(now)
+
+    def _replenish(self, now: float):
+        while (self.ready + len(self._booting) < self.buffer
+               and self.ready + len(self._booting) + len(self._in_session) < self.max_servers):
+            heapq.heappush(self._booting, now + self._jitter(self.boot_seconds))
+
+    @staticmethod
+    def _jitter(seconds: float) -> float:
+        return seconds * random.uniform(0.8, 1.2)
+
+
+class MockAMS:
+    """Claim logic and statistics shared by all request handler threads."""
+
+    def __init__(self, regions: list, latency_ms: float = 20.0, latency_jitter_ms: float = 10.0):
+        self.regions = {region.name: region for region in regions}
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            for region in self.regions.values():
+                region.reset()
+            self.stats.clear()
+
+    def claim(self, regions: list, session_id: str):
+        """Return the claim response for the first region with a ready server, or None."""
+        with self._lock:
+            now = time.monotonic()
+            for name in regions:
+                region = self.regions.get(name)
+                if region and region.try_claim(now):
+                    self.stats[f"claimed:{name}"] += 1
+                    return {
+                        "ip": "127.0.0.1",
+                        "ports": {"default": 7777},
+                        "region": name,
+                        "serverId": f"ds_{uuid.uuid4()}",
+                        "sessionId": session_id,
+                    }
+            self.stats["no_capacity"] += 1
+            return None
+
+    def simulated_latency(self) -> float:
+        return max(0.0, random.gauss(self.latency_ms, self.latency_jitter_ms)) / 1000
+
+
+def make_handler(ams: MockAMS):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def do_POST(self):
+            self._read_body()
+            if self.path.split("?")[0] != TOKEN_PATH:
+                return self._respond(http.HTTPStatus.NOT_FOUND, {"errorMessage": "not found"})
+            self._respond(http.HTTPStatus.OK, {
+                "access_token": f"mock-{uuid.uuid4()}",
+                "bans": [],
+                "display_name": "",
+                "expires_in": 3600,
+                "is_comply": True,
+                "namespace": "mock",
+                "permissions": [],
+                "refresh_expires_in": 0,
+                "refresh_token": "",
+                "roles": [],
+                "token_type": "Bearer",
+                "user_id": "",
+            })
+
+        def do_PUT(self):
+            body = self._read_body()
+            if not CLAIM_PATH.match(self.path.split("?")[0]):
+                return self._respond(http.HTTPStatus.NOT_FOUND, {"errorMessage": "not found"})
+            time.sleep(ams.simulated_latency())
+            result = ams.claim(body.get("regions", []), body.get("sessionId", ""))
+            if result is None:
+                return self._respond(http.HTTPStatus.NOT_FOUND, {"errorMessage": "no servers available", "traceId": ""})
+            self._respond(http.HTTPStatus.OK, result)
+
+        def _read_body(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                return json.loads(raw) if raw else {}
+            except ValueError:
+                return {}
+
+        def _respond(self, status, payload: dict):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass  # per-request logging would dominate benchmark output
+
+    return Handler
+
+
+def start_server(ams: MockAMS, port: int) -> ThreadingHTTPServer:
+    """Serve the mock API on a background thread and return the server."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(ams))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_region(value: str) -> tuple:
+    """Parse NAME:BUFFER:MAX, e.g. us-west-2:5:20."""
+    try:
+        name, buffer, max_servers = value.split(":")
+        return name, int(buffer), int(max_servers)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected NAME:BUFFER:MAX, got {value!r}")
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser):
+    """Arguments describing the simulated fleet, shared with the benchmark."""
+    parser.add_argument("--region", type=parse_region, action="append", dest="regions",
+                        help="Simulated region as NAME:BUFFER:MAX (repeatable, default: us-west-2:5:20 and us-east-1:5:20)")
+    parser.add_argument("--boot-seconds", type=float, default=10.0, help="Time for a replacement DS to become ready (default: 10)")
+    parser.add_argument("--session-seconds", type=float, default=60.0, help="Time a claimed DS stays in session (default: 60)")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Mean simulated API latency (default: 20)")
+    parser.add_argument("--latency-jitter-ms", type=float, default=10.0, help="Standard deviation of simulated API latency (default: 10)")
+
+
+def create_mock(args) -> MockAMS:
+    regions = args.regions or [("us-west-2", 5, 20), ("us-east-1", 5, 20)]
+    return MockAMS(
+        [MockRegion(name, buffer, max_servers, args.boot_seconds, args.session_seconds)
+         for name, buffer, max_servers in regions],
+        args.latency_ms,
+        args.latency_jitter_ms,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the AMS fleet claim API")
+    parser.add_argument("--port", type=int, default=8081, help="Port to listen on (default: 8081)")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    ams = create_mock(args)
+    server = start_server(ams, args.port)
+    print(f"Mock AMS listening on http://127.0.0.1:{args.port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(", ".join(f"{key}={count}" for key, count in sorted(ams.stats.items())))
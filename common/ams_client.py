@@ -0,0 +1,229 @@
+"""
+Shared setup of an authenticated AccelByte SDK client for AMS.
+
+Every tool and the matchmaker initialize the SDK through this module so they all:
+- reuse one pooled httpx client (keep-alive connections, HTTP/2 where the server
+  supports it) instead of opening a new TLS connection per call,
+- keep the client token in a local file and reuse it while most of its lifetime
+  is left, so back-to-back script runs skip the login round trip,
+- refresh the token before it expires when running for a long time.
+
+Independent calls can be sent concurrently over the shared pool with run_requests().
+Both run_requests() and run_request_with_status() also return the HTTP status code.
+The SDK turns documented error codes (e.g. 404 or 500) into error models that do not
+carry the status, so callers cannot get it from the error alone.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Tuple
+
+import accelbyte_py_sdk
+from accelbyte_py_sdk.core import (
+    ConfigRepository,
+    EnvironmentConfigRepository,
+    HttpxHttpClient,
+    InMemoryTokenRepository,
+    get_config_repository,
+    get_token_repository,
+    run_request,
+)
+from accelbyte_py_sdk.services.auth import (
+    LoginClientTimer,
+    OnDemandTokenRefresher,
+    login_client,
+    set_on_demand_token_refresher,
+)
+from accelbyte_py_sdk.api.ams.operations.fleets import FleetList
+from accelbyte_py_sdk.api.ams.operations.images import ImageGet, ImageList
+
+DEFAULT_TOKEN_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ams-samples", "token.json")
+MIN_REMAINING_LIFETIME = 0.5  # login() reuses a token only while at least half its lifetime is left
+REFRESH_RATE = 0.8  # with auto_refresh, refresh once 80% or less of the token lifetime is left
+
+
+class FileTokenRepository(InMemoryTokenRepository):
+    """
+    SDK token repository that also keeps the token in a JSON file.
+
+    Tokens are stored per base URL and client ID, so one file can serve several
+    environments. The file holds bearer tokens and is only readable by its owner.
+    """
+
+    def __init__(self, path: str, cache_key: str):
+        super().__init__()
+        self.path = path
+        self.cache_key = cache_key
+        self._file_lock = threading.Lock()
+        self._load()
+
+    def store_token(self, token: Any) -> bool:
+        super().store_token(token)
+        self._save()
+        return True
+
+    def remove_token(self) -> bool:
+        super().remove_token()
+        self._save()
+        return True
+
+    def _load(self):
+        entry = self._read_all().get(self.cache_key)
+        if not entry:
+            return
+        issued_at = datetime.fromisoformat(entry["issued_at"])
+        lifetime = entry["token"].get("expires_in", 0)
+        remaining = (issued_at + timedelta(seconds=lifetime) - datetime.utcnow()).total_seconds()
+        if remaining <= lifetime * MIN_REMAINING_LIFETIME:
+            return
+        # Restore the original issue time so expiry and refresh timing stay correct
+        self._token = entry["token"]
+        self._token_issued_time = issued_at
+
+    def _save(self):
+        with self._file_lock:
+            entries = self._read_all()
+            token = self.get_token()
+            if token is None:
+                entries.pop(self.cache_key, None)
+            else:
+                entries[self.cache_key] = {
+                    "token": token.to_dict() if hasattr(token, "to_dict") else dict(token),
+                    "issued_at": self.get_token_issued_time_utc().isoformat(),
+                }
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".token.")  # created with mode 0600
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+    def _read_all(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+def initialize(config: Optional[ConfigRepository] = None,
+               token_cache_path: Optional[str] = DEFAULT_TOKEN_CACHE_PATH,
+               max_connections: int = 100,
+               max_keepalive_connections: int = 20):
+    """
+    Initialize the SDK with a pooled HTTP client and, unless token_cache_path is
+    None, a token repository backed by that file.
+
+    `config` defaults to the AB_BASE_URL, AB_CLIENT_ID, AB_CLIENT_SECRET and
+    AB_NAMESPACE environment variables. Calling this again has no effect.
+    """
+    if accelbyte_py_sdk.is_initialized():
+        return
+
+    config = config or EnvironmentConfigRepository()
+    if token_cache_path:
+        token_repository = FileTokenRepository(token_cache_path, f"{config.get_base_url()}|{config.get_client_id()}")
+    else:
+        token_repository = InMemoryTokenRepository()
+
+    accelbyte_py_sdk.initialize(options={
+        "config": config,
+        "token": token_repository,
+        "http": HttpxHttpClient(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        ),
+    })
+
+
+def login(auto_refresh: bool = False, **kwargs) -> Tuple[Any, Any]:
+    """
+    Initialize the SDK if needed (kwargs are passed to initialize()) and make sure
+    a client token is available, reusing the current or cached one while at least
+    MIN_REMAINING_LIFETIME of its lifetime is left. Safe to call again, e.g. after a
+    long upload, to get a fresh token before the next API calls.
+    Set auto_refresh for long-running processes. Returns (token, error) like login_client().
+    """
+    initialize(**kwargs)
+
+    token_repository = get_token_repository()
+    if token_repository.has_token() and not token_repository.has_token_expired(multiplier=MIN_REMAINING_LIFETIME):
+        if auto_refresh:
+            client_id, client_secret = get_config_repository().get_client_auth()
+            set_on_demand_token_refresher(
+                token_refresher=OnDemandTokenRefresher(
+                    refresher=LoginClientTimer(0, client_id=client_id, client_secret=client_secret),
+                    refresh_rate=REFRESH_RATE,
+                )
+            )
+        return token_repository.get_token(), None
+
+    return login_client(auto_refresh=auto_refresh, refresh_rate=REFRESH_RATE)
+
+
+def run_request_with_status(operation) -> Tuple[Any, Any, int]:
+    """
+    Like run_request(), but also return the HTTP status code of the response.
+    The status is 0 when no response was received, e.g. on connection errors.
+    """
+    status = {"code": 0}
+    parse_response = type(operation).parse_response
+
+    def parse_and_record_status(code, content_type, content):
+        status["code"] = code
+        return parse_response(operation, code, content_type, content)
+
+    operation.parse_response = parse_and_record_status
+    result, error = run_request(operation)
+    return result, error, status["code"]
+
+
+def run_requests(operations: list, max_parallel: int = 8) -> List[Tuple[Any, Any, int]]:
+    """
+    Run independent operations concurrently over the shared connection pool.
+    Returns a (result, error, status code) triple for each operation, in order.
+    """
+    if not operations:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_parallel, len(operations))) as pool:
+        return list(pool.map(run_request_with_status, operations))
+
+
+def list_images_and_fleets(namespace: Optional[str] = None):
+    """
+    Fetch the image and fleet lists of a namespace in one concurrent batch.
+    Returns (images, fleets, error, status code); error is the first failure, if any.
+    """
+    namespace = namespace or get_config_repository().get_namespace()
+    (images, images_error, images_status), (fleets, fleets_error, fleets_status) = run_requests([
+        ImageList.create(namespace=namespace),
+        FleetList.create(namespace=namespace),
+    ])
+    if images_error:
+        return None, None, images_error, images_status
+    if fleets_error:
+        return None, None, fleets_error, fleets_status
+    return images.images or [], fleets.fleets or [], None, fleets_status
+
+
+def image_exists(image_id: str, namespace: Optional[str] = None) -> bool:
+    """
+    True if the image is still available in AMS, False if AMS reports it as not found.
+    Any other failure raises RuntimeError, since it says nothing about the image.
+    """
+    namespace = namespace or get_config_repository().get_namespace()
+    _, error, status = run_request_with_status(ImageGet.create(image_id=image_id, namespace=namespace))
+    if error is None:
+        return True
+    if status == 404:
+        return False
+    raise RuntimeError(f"Could not check image {image_id} (status {status}): {error}")
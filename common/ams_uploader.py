@@ -0,0 +1,234 @@
+"""
+Streaming wrapper around `ams-cli upload`.
+
+The CLI's stdout and stderr are read line by line while it runs, so progress is
+reported as it happens and the `img_...` ID is captured as soon as it is printed.
+Only a short tail of the output is kept in memory. Idle and total timeouts make
+sure a stuck upload fails instead of hanging the pipeline.
+"""
+
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional
+
+IMAGE_ID_PATTERN = re.compile(r"img_[a-zA-Z0-9_-]+")
+PROGRESS_PATTERN = re.compile(r"(\d{1,3}(?:\.\d+)?)\s*%")
+
+READ_SIZE = 64 * 1024
+MAX_LINE_LENGTH = 64 * 1024  # longer output without a line break is split
+TAIL_LINES = 50  # output lines kept for error reporting
+
+
+class UploadError(Exception):
+    """Raised when the upload fails, times out, or no image ID is reported."""
+
+    def __init__(self, message: str, output_tail: Optional[List[str]] = None):
+        super().__init__(message)
+        self.output_tail = output_tail or []
+
+    def __str__(self):
+        message = super().__str__()
+        if self.output_tail:
+            message += "\n" + "\n".join(self.output_tail)
+        return message
+
+
+class UploadMetrics:
+    """Timing and throughput of a single upload."""
+
+    def __init__(self, total_bytes: Optional[int] = None):
+        self.total_bytes = total_bytes
+        self.started_at = time.monotonic()
+        self.elapsed = 0.0
+        self.percent: Optional[float] = None
+        self.lines = 0
+        self.time_to_image_id: Optional[float] = None
+
+    @property
+    def bytes_sent(self) -> Optional[int]:
+        """Estimated bytes uploaded so far, based on the reported percentage."""
+        if self.total_bytes is None or self.percent is None:
+            return None
+        return int(self.total_bytes * self.percent / 100)
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """Average upload rate in bytes per second, if it can be estimated."""
+        sent = self.bytes_sent
+        if sent is None or self.elapsed <= 0:
+            return None
+        return sent / self.elapsed
+
+    def summary(self) -> str:
+        text = f"Upload took {self.elapsed:.1f}s"
+        if self.bytes_sent is not None:
+            text += f", {_format_bytes(self.bytes_sent)}"
+        if self.throughput is not None:
+            text += f" at {_format_bytes(self.throughput)}/s"
+        return text
+
+
+class UploadResult:
+    def __init__(self, image_id: str, metrics: UploadMetrics):
+        self.image_id = image_id
+        self.metrics = metrics
+
+
+def upload_folder(
+    cli_path: str,
+    client_id: str,
+    client_secret: str,
+    hostname: str,
+    executable: str,
+    image_name: str,
+    folder: str,
+    total_bytes: Optional[int] = None,
+    idle_timeout: float = 600.0,
+    total_timeout: float = 4 * 3600.0,
+    on_progress: Optional[Callable[[UploadMetrics], None]] = None,
+) -> UploadResult:
+    """
+    Upload `folder` as a DS image with the AMS CLI and return its image ID.
+
+    Args:
+        total_bytes: Size of the build, used to estimate throughput from progress.
+        idle_timeout: Seconds without any CLI output before the upload is aborted.
+        total_timeout: Seconds the whole upload may take before it is aborted.
+        on_progress: Called with the current metrics whenever progress changes.
+    """
+    if not os.path.exists(cli_path):
+        raise UploadError(f"AMS CLI not found at {cli_path}")
+
+    command = [
+        cli_path,
+        "upload",
+        "-c", client_id,
+        "-s", client_secret,
+        "-e", executable,
+        "-n", image_name,
+        "-H", hostname,
+        "-p", folder
+    ]
+
+    metrics = UploadMetrics(total_bytes)
+    tail = deque(maxlen=TAIL_LINES)
+    image_id = None
+    lines = queue.Queue()
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    readers = [
+        threading.Thread(target=_read_lines, args=(stream, lines), daemon=True)
+        for stream in (process.stdout, process.stderr)
+    ]
+    for reader in readers:
+        reader.start()
+
+    open_streams = len(readers)
+    last_output = metrics.started_at
+    try:
+        while open_streams:
+            now = time.monotonic()
+            idle_left = idle_timeout - (now - last_output)
+            total_left = total_timeout - (now - metrics.started_at)
+            if idle_left <= 0:
+                raise UploadError(f"AMS CLI produced no output for {idle_timeout:.0f}s", list(tail))
+            if total_left <= 0:
+                raise UploadError(f"Upload did not finish within {total_timeout:.0f}s", list(tail))
+
+            try:
+                line = lines.get(timeout=min(idle_left, total_left))
+            except queue.Empty:
+                continue
+            if line is None:
+                open_streams -= 1
+                continue
+
+            last_output = time.monotonic()
+            metrics.elapsed = last_output - metrics.started_at
+            metrics.lines += 1
+            tail.append(line)
+
+            if image_id is None:
+                match = IMAGE_ID_PATTERN.search(line)
+                if match:
+                    image_id = match.group(0)
+                    metrics.time_to_image_id = metrics.elapsed
+
+            match = PROGRESS_PATTERN.search(line)
+            if match:
+                percent = min(float(match.group(1)), 100.0)
+                if percent != metrics.percent:
+                    metrics.percent = percent
+                    if on_progress:
+                        on_progress(metrics)
+
+        total_left = total_timeout - (time.monotonic() - metrics.started_at)
+        try:
+            exit_code = process.wait(timeout=max(total_left, 0))
+        except subprocess.TimeoutExpired:
+            raise UploadError(f"Upload did not finish within {total_timeout:.0f}s", list(tail))
+    finally:
+        if process.poll() is None:
+            _terminate(process)
+
+    metrics.elapsed = time.monotonic() - metrics.started_at
+    if exit_code != 0:
+        raise UploadError(f"AMS CLI exited with code {exit_code}", list(tail))
+    if image_id is None:
+        raise UploadError("AMS CLI finished but did not report an image ID", list(tail))
+
+    if total_bytes is not None:
+        metrics.percent = 100.0
+    return UploadResult(image_id, metrics)
+
+
+def print_progress(metrics: UploadMetrics):
+    """A simple on_progress callback that prints percentage and throughput."""
+    text = f"Uploading... {metrics.percent:.0f}%"
+    if metrics.throughput is not None:
+        text += f" ({_format_bytes(metrics.throughput)}/s)"
+    print(text, flush=True)
+
+
+def _read_lines(stream, lines: queue.Queue):
+    """Split a pipe into lines on \\n or \\r (progress bars) and queue them; None marks EOF."""
+    fd = stream.fileno()
+    buffer = b""
+    while True:
+        data = os.read(fd, READ_SIZE)
+        if not data:
+            break
+        buffer += data
+        *complete, buffer = re.split(rb"[\r\n]", buffer)
+        if len(buffer) > MAX_LINE_LENGTH:
+            complete.append(buffer)
+            buffer = b""
+        for raw in complete:
+            if raw.strip():
+                lines.put(raw.decode(errors="replace").rstrip())
+    if buffer.strip():
+        lines.put(buffer.decode(errors="replace").rstrip())
+    stream.close()
+    lines.put(None)
+
+
+def _terminate(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def _format_bytes(value: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
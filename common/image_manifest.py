@@ -0,0 +1,201 @@
+"""
+Content manifests and a local image cache for dedicated server builds.
+
+A manifest records a content hash for every file in a DS build folder. Files are
+hashed in parallel, and large binaries are split into fixed-size chunks that are
+also hashed in parallel. The manifest digest identifies the build, so an unchanged
+build maps to the same digest and can reuse a previously uploaded `img_...` ID
+instead of uploading again.
+"""
+
+import hashlib
+import json
+import os
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+MANIFEST_VERSION = 1
+CHUNK_SIZE = 64 * 1024 * 1024  # files larger than this are hashed as several chunks in parallel
+READ_SIZE = 1024 * 1024
+
+
+class FileEntry:
+    """A single file in a build manifest."""
+
+    def __init__(self, path: str, size: int, executable: bool, digest: str):
+        self.path = path  # relative to the build folder, always using "/" separators
+        self.size = size
+        self.executable = executable
+        self.digest = digest
+
+    def to_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "size": self.size,
+            "executable": self.executable,
+            "digest": self.digest,
+        }
+
+
+class BuildManifest:
+    """The content manifest of a DS build folder."""
+
+    def __init__(self, executable: str, files: List[FileEntry]):
+        self.executable = executable
+        self.files = sorted(files, key=lambda f: f.path)
+        self.digest = self._compute_digest()
+
+    @property
+    def total_size(self) -> int:
+        return sum(f.size for f in self.files)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": MANIFEST_VERSION,
+            "executable": self.executable,
+            "files": [f.to_dict() for f in self.files],
+        }
+
+    def _compute_digest(self) -> str:
+        # The executable name is part of the image, so it is part of the identity too.
+        canonical = json.dumps(self.to_dict(), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _hash_chunk(path: str, offset: int, length: int) -> bytes:
+    """Hash `length` bytes of `path` starting at `offset`."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        f.seek(offset)
+        remaining = length
+        while remaining > 0:
+            data = f.read(min(READ_SIZE, remaining))
+            if not data:
+                break
+            h.update(data)
+            remaining -= len(data)
+    return h.digest()
+
+
+def _list_files(folder: str) -> List[Tuple[str, str, os.stat_result]]:
+    """Return (relative path, absolute path, stat) for every file under `folder`."""
+    files = []
+    for root, dirs, names in os.walk(folder):
+        dirs.sort()
+        for name in sorted(names):
+            full_path = os.path.join(root, name)
+            st = os.stat(full_path)
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            rel_path = os.path.relpath(full_path, folder).replace(os.sep, "/")
+            files.append((rel_path, full_path, st))
+    return files
+
+
+def folder_size(folder: str) -> int:
+    """Total size of the files in `folder`, from file metadata only (nothing is read)."""
+    if not os.path.isdir(folder):
+        raise FileNotFoundError(f"DS folder not found: {folder}")
+    return sum(st.st_size for _, _, st in _list_files(folder))
+
+
+def build_manifest(folder: str, executable: str, max_workers: Optional[int] = None) -> BuildManifest:
+    """
+    Hash every file in `folder` and return its manifest.
+
+    Small files are hashed whole; files larger than CHUNK_SIZE are hashed as
+    independent chunks and their digest is the hash of the chunk digests.
+    All files and chunks are hashed concurrently (hashlib releases the GIL).
+    """
+    if not os.path.isdir(folder):
+        raise FileNotFoundError(f"DS folder not found: {folder}")
+
+    files = _list_files(folder)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        chunk_futures = []
+        for _, full_path, st in files:
+            offsets = range(0, st.st_size, CHUNK_SIZE) if st.st_size > 0 else [0]
+            chunk_futures.append([
+                pool.submit(_hash_chunk, full_path, offset, min(CHUNK_SIZE, st.st_size - offset))
+                for offset in offsets
+            ])
+
+        entries = []
+        for (rel_path, _, st), futures in zip(files, chunk_futures):
+            chunk_digests = [f.result() for f in futures]
+            if len(chunk_digests) == 1:
+                digest = chunk_digests[0].hex()
+            else:
+                digest = hashlib.sha256(b"".join(chunk_digests)).hexdigest()
+            executable_bit = bool(st.st_mode & stat.S_IXUSR)
+            entries.append(FileEntry(rel_path, st.st_size, executable_bit, digest))
+
+    return BuildManifest(executable, entries)
+
+
+class ImageCache:
+    """
+    Local cache mapping manifest digests to uploaded AMS image IDs.
+
+    Entries are scoped by AMS host and namespace, since images belong to a
+    namespace: the same build uploaded to different namespaces or environments
+    gets separate image IDs. The cache is a JSON file; keep it
+    between CI runs (for example as a cached directory) to skip re-uploads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.images: Dict[str, dict] = {}
+        self._load()
+
+    def get(self, host: str, namespace: str, digest: str) -> Optional[str]:
+        """Return the cached image ID for a manifest digest, or None."""
+        entry = self.images.get(self._key(host, namespace, digest))
+        return entry["image_id"] if entry else None
+
+    def put(self, host: str, namespace: str, manifest: BuildManifest, image_id: str, image_name: str):
+        """Record that `manifest` was uploaded to `namespace` on `host` as `image_id`."""
+        self.images[self._key(host, namespace, manifest.digest)] = {
+            "image_id": image_id,
+            "image_name": image_name,
+            "file_count": len(manifest.files),
+            "total_size": manifest.total_size,
+            "uploaded_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def remove(self, host: str, namespace: str, digest: str):
+        """Forget a cached entry, e.g. when its image no longer exists in AMS."""
+        self.images.pop(self._key(host, namespace, digest), None)
+
+    def save(self):
+        """Write the cache atomically so an interrupted run never corrupts it."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".image_cache.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": MANIFEST_VERSION, "images": self.images}, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable image cache {self.path}: {e}")
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.images = data.get("images", {})
+
+    @staticmethod
+    def _key(host: str, namespace: str, digest: str) -> str:
+        return f"{host}/{namespace}/{digest}"
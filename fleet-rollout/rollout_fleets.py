@@ -0,0 +1,231 @@
+# these environment variables are required:
+# AB_BASE_URL
+# AB_NAMESPACE
+# AB_CLIENT_ID
+# AB_CLIENT_SECRET
+#
+# Usage: python rollout_fleets.py fleets.yaml [--image-id img_...] [--dry-run]
+#
+# Reads a YAML or JSON spec describing many fleets, compares it to the fleets that
+# already exist in the namespace, and creates or updates fleets concurrently.
+
+import argparse
+import copy
+import json
+import os
+import random
+import sys
+import time
+import yaml
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from accelbyte_py_sdk.api.ams.models import ApiFleetParameters
+from accelbyte_py_sdk.api.ams.operations.fleets import FleetCreate, FleetGet, FleetUpdate
+
+# Shared helpers live in ../common (the Dockerfile copies them next to this script)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import ams_client
+
+AB_NAMESPACE = os.getenv("AB_NAMESPACE")
+
+ACTION_CREATE = "create"
+ACTION_UPDATE = "update"
+ACTION_UNCHANGED = "unchanged"
+
+
+def load_spec(path: str, image_id: str = None) -> list:
+    """
+    Load the rollout spec and return the desired fleet configurations.
+
+    The spec has an optional `defaults` mapping that is deep-merged into every
+    entry of `fleets`. Entries use the AMS fleet JSON shape (as accepted by
+    ApiFleetParameters.create_from_dict). `image_id` overrides the image of every fleet.
+    """
+    with open(path) as f:
+        spec = yaml.safe_load(f)  # YAML is a superset of JSON, so this reads both
+
+    defaults = spec.get("defaults", {})
+    fleets = []
+    for entry in spec.get("fleets", []):
+        fleet = _deep_merge(defaults, entry)
+        if image_id:
+            fleet.setdefault("imageDeploymentProfile", {})["imageId"] = image_id
+        if not fleet.get("name"):
+            raise ValueError(f"Fleet entry is missing a name: {entry}")
+        fleets.append(fleet)
+
+    names = [fleet["name"] for fleet in fleets]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate fleet names in spec: {', '.join(sorted(duplicates))}")
+    return fleets
+
+
+def plan_rollout(desired: list, max_parallel: int, retries: int) -> list:
+    """
+    Compare the desired fleets with the existing ones.
+    Returns a list of (action, fleet config, existing fleet ID or None, changed top-level fields).
+    """
+    # Images and fleets are listed in one concurrent batch
+    images, fleets = _with_retries(_list_images_and_fleets, retries)
+    existing = {fleet.name: fleet.id_ for fleet in fleets}
+
+    # FleetUpdate replaces the whole fleet, so both sides are compared in full as
+    # the fleet parameters that an update would send
+    desired = [(fleet, _comparable(fleet)) for fleet in desired]
+
+    image_ids = {image.id_ for image in images}
+    missing = sorted({fleet.get("imageDeploymentProfile", {}).get("imageId") for fleet, _ in desired} - image_ids, key=str)
+    if missing:
+        raise ValueError(f"Images not found in namespace {AB_NAMESPACE}: {', '.join(map(str, missing))}")
+
+    plan = []
+    to_fetch = []
+    for fleet, comparable in desired:
+        fleet_id = existing.get(fleet["name"])
+        if fleet_id is None:
+            plan.append((ACTION_CREATE, fleet, None, []))
+        else:
+            to_fetch.append((fleet, comparable, fleet_id))
+
+    # Fetch the full configuration of existing fleets concurrently to diff them
+    with ThreadPoolExecutor(max_workers=max_parallel) as pool:
+        futures = {
+            pool.submit(_run_with_retries, FleetGet.create(fleet_id=fleet_id, namespace=AB_NAMESPACE), retries): (fleet, comparable, fleet_id)
+            for fleet, comparable, fleet_id in to_fetch
+        }
+        for future in as_completed(futures):
+            fleet, comparable, fleet_id = futures[future]
+            current = _comparable(future.result().to_dict())
+            changed = sorted(key for key in comparable.keys() | current.keys() if comparable.get(key) != current.get(key))
+            plan.append((ACTION_UPDATE if changed else ACTION_UNCHANGED, fleet, fleet_id, changed))
+
+    return sorted(plan, key=lambda item: item[1]["name"])
+
+
+def apply_rollout(plan: list, max_parallel: int, retries: int) -> bool:
+    """Apply creates and updates concurrently. Returns True if every change succeeded."""
+    changes = [item for item in plan if item[0] != ACTION_UNCHANGED]
+    if not changes:
+        print("All fleets are up to date.")
+        return True
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max_parallel) as pool:
+        futures = {pool.submit(_apply_change, action, fleet, fleet_id, retries): (action, fleet)
+                   for action, fleet, fleet_id, _ in changes}
+        for future in as_completed(futures):
+            action, fleet = futures[future]
+            try:
+                fleet_id = future.result()
+                print(f"  {action}d {fleet['name']} ({fleet_id})")
+            except Exception as e:
+                failed += 1
+                print(f"  failed to {action} {fleet['name']}: {e}")
+
+    print(f"{len(changes) - failed}/{len(changes)} changes applied.")
+    return failed == 0
+
+
+def _apply_change(action: str, fleet: dict, fleet_id: str, retries: int) -> str:
+    params = ApiFleetParameters.create_from_dict(fleet)
+    if action == ACTION_CREATE:
+        result = _run_with_retries(FleetCreate.create(body=params, namespace=AB_NAMESPACE), retries)
+        return result.id_
+    _run_with_retries(FleetUpdate.create(body=params, fleet_id=fleet_id, namespace=AB_NAMESPACE), retries)
+    return fleet_id
+
+
+def _list_images_and_fleets():
+    images, fleets, error, status = ams_client.list_images_and_fleets(AB_NAMESPACE)
+    return (images, fleets), error, status
+
+
+def _run_with_retries(operation, retries: int):
+    """Run an operation, retrying transient failures with exponential backoff and jitter."""
+    return _with_retries(lambda: ams_client.run_request_with_status(operation), retries)
+
+
+def _with_retries(request, retries: int):
+    """Call `request` (returning (result, error, status code)) until it succeeds or fails permanently."""
+    for attempt in range(retries + 1):
+        result, error, status = request()
+        if not error:
+            return result
+        if attempt == retries or not _is_retryable(status):
+            raise RuntimeError(f"[{status}] {error}" if status else str(error))
+        time.sleep(min(2 ** attempt, 30) * random.uniform(0.5, 1.0))
+
+
+def _is_retryable(status: int) -> bool:
+    # Connection failures (no status) and 429/5xx responses are transient; other API errors are not.
+    # Classify by status code: documented codes such as 500 come back as error models, not HttpResponse.
+    return status == 0 or status == 429 or status >= 500
+
+
+def _deep_merge(base: dict, override: dict) -> dict:
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def _comparable(fleet: dict) -> dict:
+    """
+    Project a fleet (spec entry or FleetGet result) onto the fields FleetUpdate sends.
+    Empty values are dropped, since omitting a field and sending it empty are the
+    same to a full replace, and regions are keyed by name so their order is ignored.
+    """
+    fleet = _drop_empty(ApiFleetParameters.create_from_dict(fleet).to_dict())
+    if isinstance(fleet.get("regions"), list):
+        fleet["regions"] = {region.get("region"): region for region in fleet["regions"]}
+    return fleet
+
+
+def _drop_empty(value):
+    if isinstance(value, dict):
+        value = {key: _drop_empty(item) for key, item in value.items()}
+        return {key: item for key, item in value.items() if item not in (None, [], {})}
+    if isinstance(value, list):
+        return [_drop_empty(item) for item in value]
+    return value
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Create and update AMS fleets from a declarative spec")
+    parser.add_argument("spec", help="Path to a YAML or JSON fleet spec")
+    parser.add_argument("--image-id", help="Roll this image out to every fleet in the spec")
+    parser.add_argument("--max-parallel", type=int, default=4, help="Maximum concurrent API requests (default: 4)")
+    parser.add_argument("--retries", type=int, default=3, help="Retries for transient API failures (default: 3)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without applying it")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    if not AB_NAMESPACE:
+        raise ValueError("Missing or empty required variable: AB_NAMESPACE")
+
+    desired = load_spec(args.spec, args.image_id)
+
+    # Log in once; every request below reuses the token and the pooled HTTP connections
+    _, error = ams_client.login(max_keepalive_connections=max(20, args.max_parallel))
+    if error:
+        print("Login failed:", error)
+        exit(1)
+
+    plan = plan_rollout(desired, args.max_parallel, args.retries)
+    print("Rollout plan:")
+    for action, fleet, fleet_id, changed in plan:
+        print(f"  {action:<9} {fleet['name']}" + (f" ({fleet_id})" if fleet_id else "")
+              + (f": {', '.join(changed)}" if changed else ""))
+
+    if args.dry_run:
+        print(json.dumps([fleet for action, fleet, _, _ in plan if action != ACTION_UNCHANGED], indent=2))
+        exit(0)
+
+    if not apply_rollout(plan, args.max_parallel, args.retries):
+        exit(1)
+    print("Done.")
@@ -1,16 +1,20 @@
 import os
 import signal
 import json
+import sys
+import time
+from datetime import datetime, timezone
 
-import accelbyte_py_sdk
-from accelbyte_py_sdk.core import MyConfigRepository
-from accelbyte_py_sdk.services.auth import login_client
 from accelbyte_py_sdk.api.ams import fleet_claim_by_keys
 from accelbyte_py_sdk.api.ams.models import ApiFleetClaimByKeysReq
 import asyncio
 from websockets.asyncio.server import serve, broadcast
 import http
 
+# Shared helpers live in ../common (the Dockerfile copies them next to this script)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import ams_client
+
 # these environment variables are required:
 # AB_BASE_URL
 # AB_NAMESPACE
@@ -21,9 +25,11 @@ import http
 # CLAIM_KEYS (default: "default")
 # REGIONS (default: "us-west-2, us-east-1")
 # LOCAL_SERVER (set this to the IP:PORT of a local server to always return that server's IP:PORT to clients instead of claiming a server from AMS)
+# CLAIM_LOG_PATH (append a JSON line per successful claim to this file, readable by ../capacity-planner)
 default_claim_keys = os.environ.get("CLAIM_KEYS", "default").split(",")
 default_regions = os.environ.get("REGIONS", "us-west-2,us-east-1").split(",")
 localServer = os.environ.get("LOCAL_SERVER")
+claimLogPath = os.environ.get("CLAIM_LOG_PATH")
 
 CONNECTIONS = set()
 stop = False
@@ -50,22 +56,28 @@ async def register(websocket):
 
 async def matchmaker():
     print("matchmaker started")
+    match_found_at = None  # when the match currently waiting for a server was found
     while not stop:
         match_size = 2
+        if len(CONNECTIONS) < match_size:
+            match_found_at = None
         while len(CONNECTIONS) >= match_size:
             print("Match found! Requesting server...")
+            if match_found_at is None:
+                match_found_at = time.monotonic()
             matched_clients = list(CONNECTIONS)[:match_size]
             match_message = json.dumps({"type": "OnMatchFound", "message": "Match found! Requesting server..."})
             broadcast(matched_clients, match_message)
             # normally, the ordered list of regions to try to get a server from would come from the game client's matchmaking request
             # and is based on client ping times to each region.  
             # For this example, we keep the matchmaking logic super simple and just use a default list of regions
-            host_port = claim(default_claim_keys, default_regions)
+            host_port = claim(default_claim_keys, default_regions, requested_at=match_found_at)
             if not host_port:
                 print("No server available. Waiting...")
                 match_message = json.dumps({"type": "OnServerClaimFailed", "message": "No server available. Waiting..."})
                 broadcast(matched_clients, match_message)
                 break
+            match_found_at = None
             print("Server found! Connecting players...")
             match_message = json.dumps({"type": "OnServerReady", "message": host_port})
             broadcast(matched_clients, match_message)
@@ -76,27 +88,44 @@ async def matchmaker():
         await asyncio.sleep(2)
 
 
-def claim(claim_keys, regions, session_id="none"):
+def claim(claim_keys, regions, session_id="none", requested_at=None):
     if localServer:
         return localServer
     
+    requested_at = requested_at or time.monotonic()
     body = ApiFleetClaimByKeysReq().with_claim_keys(claim_keys).with_regions(regions).with_session_id(session_id)
     result, err = fleet_claim_by_keys(body=body)
     print(result, err)
     if err:
         return
 
+    log_claim(result.region, time.monotonic() - requested_at)
     host_port = result.ip + ":" + str(result.ports["default"])
     print(host_port)
     return host_port
 
 
+def log_claim(region, time_to_claim):
+    # One JSON line per claim, in the claim log format of ../capacity-planner
+    if not claimLogPath:
+        return
+    entry = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "region": region,
+        "time_to_claim": round(time_to_claim, 3),
+    }
+    with open(claimLogPath, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
 async def main():
     signal.signal(signal.SIGTERM, sigterm_handler)
-    accelbyte_py_sdk.initialize()
+    # Claims share one pooled HTTP client, so they skip the TCP/TLS handshake
+    ams_client.initialize()
 
     if not localServer:
-        _, error = login_client(auto_refresh=True)
+        # Reuses a cached client token across restarts and refreshes it before it expires
+        _, error = ams_client.login(auto_refresh=True)
         if error:
             print(error)
             exit(1)
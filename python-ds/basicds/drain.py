@@ -0,0 +1,159 @@
+"""
+Drain orchestration for AMS dedicated servers.
+
+When AMS sends a drain signal the DS should stop accepting new players, let
+active sessions finish, and exit. This module tracks active sessions, notifies
+players with a countdown, and enforces a hard deadline so a drained server
+never lingers indefinitely.
+Reference: https://docs.accelbyte.io/gaming-services/services/ams/AMS-watchdog-protocol/
+"""
+
+import math
+import threading
+import time
+import logging
+from typing import Optional, Callable, Set
+
+logger = logging.getLogger(__name__)
+
+# Reasons passed to the on_exit callback
+EXIT_SESSIONS_COMPLETE = "sessions_complete"
+EXIT_DEADLINE = "deadline"
+
+
+class DrainController:
+    """
+    Tracks active game sessions and drives the server from drain to exit.
+
+    Usage:
+    - Call session_started()/session_ended() as game sessions begin and end.
+      session_started() returns False once draining, so the caller can reject
+      new players.
+    - Call start_drain() when the watchdog sends a drain message.
+    - on_exit fires exactly once, either when the last session ends or when
+      the hard deadline expires, whichever comes first.
+    """
+
+    def __init__(self, deadline_seconds: float = 300.0, countdown_interval: float = 30.0):
+        if deadline_seconds <= 0:
+            raise ValueError("deadline_seconds must be positive")
+        if countdown_interval <= 0:
+            raise ValueError("countdown_interval must be positive")
+
+        self.deadline_seconds = deadline_seconds
+        self.countdown_interval = countdown_interval
+        self.draining = False
+        self.drain_started_at: Optional[float] = None
+        self.drain_duration: Optional[float] = None
+        self.exit_reason: Optional[str] = None
+        self._active_sessions: Set[str] = set()
+        self._lock = threading.Lock()
+        self._exited = threading.Event()
+        self._deadline_thread: Optional[threading.Thread] = None
+
+        # Callbacks
+        self.on_countdown: Optional[Callable[[int], None]] = None  # seconds remaining
+        self.on_exit: Optional[Callable[[str], None]] = None  # exit reason
+
+    @property
+    def accepting_sessions(self) -> bool:
+        """True while the server may accept new sessions and players."""
+        return not self.draining
+
+    @property
+    def active_session_count(self) -> int:
+        with self._lock:
+            return len(self._active_sessions)
+
+    def session_started(self, session_id: str) -> bool:
+        """
+        Register a new active session.
+        Returns False (and does not register it) if the server is draining.
+        """
+        with self._lock:
+            if self.draining:
+                logger.warning(f"Rejecting session {session_id}: server is draining")
+                return False
+            self._active_sessions.add(session_id)
+
+        logger.info(f"Session started: {session_id}")
+        return True
+
+    def session_ended(self, session_id: str):
+        """
+        Mark a session as complete.
+        If the server is draining and this was the last session, triggers exit.
+        """
+        with self._lock:
+            self._active_sessions.discard(session_id)
+            remaining = len(self._active_sessions)
+            finished = self.draining and remaining == 0
+
+        logger.info(f"Session ended: {session_id} ({remaining} active)")
+        if finished:
+            self._finish(EXIT_SESSIONS_COMPLETE)
+
+    def start_drain(self):
+        """
+        Begin draining: stop accepting sessions and start the deadline countdown.
+        Calling this more than once has no effect.
+        """
+        with self._lock:
+            if self.draining:
+                return
+            self.draining = True
+            self.drain_started_at = time.monotonic()
+            remaining = len(self._active_sessions)
+
+        logger.warning(
+            f"Draining with {remaining} active session(s), "
+            f"hard deadline in {self.deadline_seconds:.0f}s"
+        )
+
+        if remaining == 0:
+            self._finish(EXIT_SESSIONS_COMPLETE)
+            return
+
+        self._deadline_thread = threading.Thread(target=self._deadline_loop, daemon=True)
+        self._deadline_thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the drain has finished. Returns True if it has."""
+        return self._exited.wait(timeout)
+
+    def _deadline_loop(self):
+        """Send countdown notifications until sessions complete or the deadline expires."""
+        deadline = self.drain_started_at + self.deadline_seconds
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            if self.on_countdown:
+                try:
+                    self.on_countdown(math.ceil(remaining))
+                except Exception as e:
+                    logger.error(f"Error in drain countdown callback: {e}")
+
+            if self._exited.wait(min(self.countdown_interval, remaining)):
+                return
+
+        with self._lock:
+            abandoned = len(self._active_sessions)
+        logger.warning(f"Drain deadline reached with {abandoned} active session(s) remaining")
+        self._finish(EXIT_DEADLINE)
+
+    def _finish(self, reason: str):
+        """Record drain-to-exit time and fire on_exit exactly once."""
+        with self._lock:
+            if self._exited.is_set():
+                return
+            self.exit_reason = reason
+            self.drain_duration = time.monotonic() - self.drain_started_at
+            self._exited.set()
+
+        logger.info(f"Drain complete ({reason}), drain-to-exit time: {self.drain_duration:.2f}s")
+
+        if self.on_exit:
+            self.on_exit(reason)
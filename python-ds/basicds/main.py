@@ -9,8 +9,10 @@ import argparse
 import logging
 import signal
 import sys
+import threading
 import time
 from .ams_watchdog import AMSWatchdogClient
+from .drain import DrainController
 
 
 # Configure logging
@@ -26,18 +28,24 @@ class BasicDS:
     Basic Dedicated Server that implements AMS watchdog protocol.
     """
     
-    def __init__(self, ds_id: str, watchdog_url: str = "ws://localhost:5555/watchdog", port: int = 7777):
+    def __init__(self, ds_id: str, watchdog_url: str = "ws://localhost:5555/watchdog", port: int = 7777,
+                 drain_timeout: float = 300.0):
         self.ds_id = ds_id
         self.port = port
         self.watchdog_client = AMSWatchdogClient(ds_id, watchdog_url)
+        self.drain_controller = DrainController(deadline_seconds=drain_timeout)
         self.running = True
-        self.in_session = False
+        self._stop_event = threading.Event()
         
         # Set up watchdog callbacks
         self.watchdog_client.on_drain = self._handle_drain
         self.watchdog_client.on_connected = self._handle_connected
         self.watchdog_client.on_disconnected = self._handle_disconnected
         
+        # Set up drain callbacks
+        self.drain_controller.on_countdown = self._handle_drain_countdown
+        self.drain_controller.on_exit = self._handle_drain_complete
+        
         # Set up signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
@@ -64,10 +72,18 @@ class BasicDS:
         
         return True
     
+    @property
+    def in_session(self) -> bool:
+        """True while at least one game session is active."""
+        return self.drain_controller.active_session_count > 0
+    
     def stop(self):
         """Stop the dedicated server and disconnect from watchdog."""
+        if self._stop_event.is_set():
+            return
         logger.info("Stopping BasicDS server")
         self.running = False
+        self._stop_event.set()  # wake the main loop immediately
         
         if self.watchdog_client:
             self.watchdog_client.disconnect()
@@ -99,13 +115,16 @@ class BasicDS:
             # - Handle game sessions
             # - Process player actions
             
-            # For demo purposes, just sleep
-            time.sleep(1)
+            # For demo purposes, just wait (returns early when stop() is called)
+            if self._stop_event.wait(1):
+                break
             
             # Example of session management
-            if not self.in_session:
+            if self.drain_controller.accepting_sessions:
                 # Check for new session allocation from AMS
-                # This would typically come through game session APIs
+                # This would typically come through game session APIs.
+                # Register sessions with self.drain_controller.session_started(session_id)
+                # and call self.drain_controller.session_ended(session_id) when they finish.
                 pass
     
     def _handle_connected(self):
@@ -124,24 +143,26 @@ class BasicDS:
         1. Stop accepting new game sessions
         2. Allow current sessions to complete naturally
         3. Shut down gracefully when no active sessions remain
+        
+        The drain controller handles all three: it rejects new sessions, waits
+        for active ones to end, and forces shutdown at the hard deadline.
         """
         logger.warning("Received drain signal from AMS - preparing for graceful shutdown")
+        self.drain_controller.start_drain()
+    
+    def _handle_drain_countdown(self, seconds_remaining: int):
+        """Called periodically while draining with the time left before forced shutdown."""
+        logger.info(f"Server shutting down in {seconds_remaining}s")
         
-        # TODO: Implement drain logic based on your game requirements
+        # TODO: Notify connected players of the impending shutdown
         # Examples:
-        # - Set flag to reject new session allocations
-        # - Notify players of impending server shutdown
-        # - Wait for current sessions to complete
-        # - Initiate graceful shutdown when ready
-        
-        if not self.in_session:
-            # No active sessions, should shutdown immediately
-            logger.info("No active sessions, shutting down immediately")
-            self.stop()
-        else:
-            # Wait for current session to complete
-            logger.info("Waiting for current session to complete before shutdown")
-            # You would implement session completion monitoring here
+        # - Broadcast a countdown message to clients
+        # - Prompt players to finish the current match
+    
+    def _handle_drain_complete(self, reason: str):
+        """Called once all sessions have ended or the drain deadline has expired."""
+        logger.info(f"Drain finished ({reason}), shutting down")
+        self.stop()
     
     def _signal_handler(self, signum, frame):
         """Handle system signals for graceful shutdown."""
@@ -174,6 +195,13 @@ def parse_arguments():
         help="AMS Watchdog WebSocket URL (default: ws://localhost:5555/watchdog)"
     )
     
+    parser.add_argument(
+        "--drain-timeout",
+        type=float,
+        default=300.0,
+        help="Maximum seconds to wait for active sessions after a drain signal before shutting down (default: 300)"
+    )
+    
     parser.add_argument(
         "--log-level",
         choices=["DEBUG", "INFO", "WARNING", "ERROR"],
@@ -194,7 +222,7 @@ def main():
         logging.getLogger().setLevel(getattr(logging, args.log_level))
         
         # Create and start the server
-        server = BasicDS(args.dsid, args.watchdog_url, args.port)
+        server = BasicDS(args.dsid, args.watchdog_url, args.port, args.drain_timeout)
         
         logger.info("="*50)
         logger.info("BasicDS - AccelByte AMS Compatible Server")
@@ -1,9 +1,6 @@
-import accelbyte_py_sdk
-import accelbyte_py_sdk.services.auth as auth_service
 import json
 import os
-import re
-import subprocess
+import sys
 from datetime import datetime
 from accelbyte_py_sdk.core import run_request
 
@@ -20,6 +17,12 @@ from accelbyte_py_sdk.api.ams.models import (
     ApiArtifactSamplingRule
 )
 
+# Shared helpers live in ../common (the Dockerfile copies them next to this script)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import ams_client
+from ams_uploader import UploadError, print_progress, upload_folder
+from image_manifest import ImageCache, build_manifest, folder_size
+
 # Constants, update these according to your environment.
 # Set the following environment variables: AB_BASE_URL, AB_CLIENT_ID, AB_CLIENT_SECRET, and AB_NAMESPACE.
 AMS_CLI_PATH = "./ams-cli"
@@ -28,45 +31,63 @@ DS_EXECUTABLE_NAME = "runserver"
 DS_IMAGE_NAME = f"fleet-image-{datetime.now().strftime('%Y-%m-%d_%H-%M')}"
 FLEET_NAME = f"my-production-fleet-{datetime.now().strftime('%Y-%m-%d_%H-%M')}"
 FLEET_COMMAND_LINE = "-dsid ${dsid} -port ${default_port}"
+IMAGE_CACHE_PATH = ".ams-cache/images.json"  # Maps build content hashes to uploaded image IDs; empty disables
+UPLOAD_IDLE_TIMEOUT = 600                    # Abort the upload after this many seconds without CLI output
+UPLOAD_TOTAL_TIMEOUT = 4 * 3600              # Abort the upload after this many seconds in total
 
 AB_BASE_URL, AB_CLIENT_ID, AB_CLIENT_SECRET, AB_NAMESPACE = (
     os.getenv(var) for var in ["AB_BASE_URL", "AB_CLIENT_ID", "AB_CLIENT_SECRET", "AB_NAMESPACE"]
 )
 
 def upload_image():
+    hostname = AB_BASE_URL.split("//")[-1]
+
+    # Skip the upload entirely if this exact build was uploaded before.
+    # Hashing reads the whole build, so it only happens when the cache is enabled.
+    cache = ImageCache(IMAGE_CACHE_PATH) if IMAGE_CACHE_PATH else None
+    manifest = build_manifest(DS_FOLDER_PATH, DS_EXECUTABLE_NAME) if cache else None
+    cached_image_id = cache.get(hostname, AB_NAMESPACE, manifest.digest) if cache else None
+    if cached_image_id:
+        try:
+            cached_image_available = ams_client.image_exists(cached_image_id, AB_NAMESPACE)
+        except RuntimeError as e:
+            # Keep the cache entry: a failed check does not mean the image is gone
+            print(e)
+            exit(1)
+        if cached_image_available:
+            print(f"Build unchanged (manifest {manifest.digest[:12]}), reusing DS Image ID: {cached_image_id}")
+            return cached_image_id
+        print(f"Cached DS Image ID {cached_image_id} is no longer available, uploading again")
+        cache.remove(hostname, AB_NAMESPACE, manifest.digest)
+
     if not os.path.exists(AMS_CLI_PATH):
         print("AMS CLI not found. Use `wget https://cdn.prod.ams.accelbyte.io/linux_amd64/ams -o ams-cli` to get it.")
         exit(1)
 
-    hostname = AB_BASE_URL.split("//")[-1]
-    command = [
-        AMS_CLI_PATH,
-        "upload",
-        "-c", AB_CLIENT_ID,
-        "-s", AB_CLIENT_SECRET,
-        "-e", DS_EXECUTABLE_NAME,
-        "-n", DS_IMAGE_NAME,
-        "-H", hostname,
-        "-p", DS_FOLDER_PATH
-    ]
     try:
-        # Execute the CLI to upload the DS
-        result = subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        print("Upload successful.")
-        image_id = re.search(r'img_[a-zA-Z0-9_-]+', result.stderr.decode()).group(0)
-        print(f"DS Image ID: {image_id}")
-        return image_id
+        # Execute the CLI to upload the DS, streaming its progress
+        result = upload_folder(
+            AMS_CLI_PATH, AB_CLIENT_ID, AB_CLIENT_SECRET, hostname,
+            DS_EXECUTABLE_NAME, DS_IMAGE_NAME, DS_FOLDER_PATH,
+            total_bytes=manifest.total_size if manifest else folder_size(DS_FOLDER_PATH),
+            idle_timeout=UPLOAD_IDLE_TIMEOUT,
+            total_timeout=UPLOAD_TOTAL_TIMEOUT,
+            on_progress=print_progress,
+        )
+    except UploadError as e:
+        print("An error occurred during the upload process: " + str(e))
+        return
 
-    except subprocess.CalledProcessError as e:
-        print("An error occurred during the upload process:" + e.stderr.decode())
+    image_id = result.image_id
+    print("Upload successful.")
+    print(result.metrics.summary())
+    print(f"DS Image ID: {image_id}")
+    if cache:
+        cache.put(hostname, AB_NAMESPACE, manifest, image_id, DS_IMAGE_NAME)
+        cache.save()
+    return image_id
 
 def create_fleet(image_id: str):
-    accelbyte_py_sdk.initialize()
-    _, err = auth_service.login_client()
-    if err:
-        print("Login failed:", err)
-        exit(1)
-
     # Construct the fleet configuration.
     # Note one could consider the alternative of creating the `params` from JSON with:
     # params = ApiFleetParameters.create_from_dict(json.loads(fleet_config_json))
@@ -120,7 +141,22 @@ if __name__ == "__main__":
         var_value = globals().get(var_name)
         if var_value is None or var_value == "":
             raise ValueError(f"Missing or empty required variable: {var_name}")
+    # Log in; the client token is cached on disk and reused by later runs while most of its lifetime is left
+    _, err = ams_client.login()
+    if err:
+        print("Login failed:", err)
+        exit(1)
+
     image_id = upload_image()
+    if image_id is None or image_id == "":
+        exit(1)
     print(f"Image ID: {image_id}")
+
+    # The upload can take hours; log in again if the token is no longer fresh enough for the calls below
+    _, err = ams_client.login()
+    if err:
+        print("Login failed:", err)
+        exit(1)
+
     create_fleet(image_id)
     print("Done.")
\ No newline at end of file